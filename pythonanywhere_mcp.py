@@ -5,20 +5,118 @@ This script provides functionality to push local changes to PythonAnywhere.
 """
 
 import os
+import re
+import io
 import sys
+import gzip
+import socket
 import json
+import logging
+import hashlib
+import functools
+import threading
+import tempfile
 import argparse
+import posixpath
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3 import encode_multipart_formdata
+from urllib3.connection import HTTPConnection
+from requests_toolbelt import MultipartEncoder
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
+from filelock import FileLock, Timeout
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
+log = logging.getLogger("pa_mcp")
+
+# Files at least this large are streamed from disk instead of being encoded in memory
+STREAM_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+
+# Chunk size used when sending streamed request bodies
+SEND_BLOCK_SIZE = 256 * 1024
+
+# Text formats worth gzipping when compress_uploads is enabled; below the
+# minimum size the saving is smaller than the request overhead
+COMPRESSIBLE_EXTENSIONS = {".py", ".js", ".css", ".html", ".json", ".txt", ".md"}
+COMPRESS_MIN_SIZE = 1024
+
+# push_directory fsyncs its upload log after this many entries
+WAL_FSYNC_INTERVAL = 32
+
+def loads_json(data):
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(data, indent=False):
+    """Serialise data to JSON bytes, either indented or compact, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+class KeepAliveHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keepalive so pooled connections survive idle gaps.
+    
+    Streamed bodies are also sent in larger blocks than http.client's default, so a
+    big upload takes fewer read/send round trips through Python.
+    """
+    
+    def init_poolmanager(self, *args, **kwargs):
+        socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            socket_options += [
+                (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60),
+                (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10),
+            ]
+        kwargs.setdefault("socket_options", socket_options)
+        kwargs.setdefault("blocksize", SEND_BLOCK_SIZE)
+        super().init_poolmanager(*args, **kwargs)
+
+
+class RewindableMultipartEncoder(MultipartEncoder):
+    """MultipartEncoder that urllib3 can rewind, so a retried request resends the whole body"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._position = 0
+    
+    def read(self, size=-1):
+        data = super().read(size)
+        self._position += len(data)
+        return data
+    
+    def tell(self):
+        return self._position
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("can only rewind to the start")
+        for value in self.fields.values():
+            if isinstance(value, tuple) and hasattr(value[1], "seek"):
+                value[1].seek(0)
+        self.__init__(self.fields, self.boundary_value, self.encoding)
+        return 0
+
+
 class PythonAnywhereClient:
     """Client for interacting with PythonAnywhere API"""
     
-    def __init__(self, api_token=None):
+    def __init__(self, api_token=None, pool_size=16, compress=False):
         """Initialize the PythonAnywhere client with API token"""
         self.api_token = api_token or os.getenv('PYTHONANYWHERE_API_TOKEN')
         if not self.api_token:
@@ -30,100 +128,370 @@ class PythonAnywhereClient:
         
         self.api_base_url = f"https://www.pythonanywhere.com/api/v0/user/{self.username}"
         self.headers = {"Authorization": f"Token {self.api_token}"}
-    
-    def list_files(self, path):
-        """List files in a directory on PythonAnywhere"""
-        endpoint = f"{self.api_base_url}/files/path{path}"
-        response = requests.get(endpoint, headers=self.headers)
         
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error listing files: {response.status_code} - {response.text}")
-            return None
+        # Endpoint URLs are fixed per user, so they're built once here
+        self._files_url = self.api_base_url + "/files/path%s"
+        self._reload_url = f"{self.api_base_url}/webapps/{self.username}.pythonanywhere.com/reload/"
+        
+        # Reuse connections across calls instead of a new TCP+TLS handshake per request.
+        # pool_size should be at least the number of concurrent uploads, otherwise
+        # urllib3 discards the surplus connections and every extra worker reconnects.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        #
+        # Transient failures are retried here with exponential backoff, honouring
+        # Retry-After. POST is included since every call this client makes is safe to
+        # repeat: uploads overwrite the same path, mkdir and reload are idempotent.
+        # Once retries run out the last response is returned rather than raised, so
+        # raise_for_status() reports the API's own error message.
+        retries = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self.session.mount("https://", KeepAliveHTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries))
+        
+        # Whether gzip-encoded uploads are accepted is only known after probing
+        self.compress = compress
+        self._gzip_supported = None
+        self._gzip_lock = threading.Lock()
+        
+        # Remote directories known to exist, so they aren't created again
+        self._remote_dirs_known = set()
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+    
+    @staticmethod
+    def _error_detail(error):
+        """Describe a failed request, including the API's error message when there is one"""
+        if error.response is not None:
+            return f"{error.response.status_code} - {error.response.text}"
+        return str(error)
     
     def upload_file(self, local_path, remote_path):
         """Upload a file to PythonAnywhere"""
-        if not os.path.exists(local_path):
-            print(f"Error: Local file {local_path} does not exist")
+        endpoint = self._files_url % remote_path
+        try:
+            # Unbuffered, so reads go straight from the file descriptor into each
+            # chunk instead of being copied through a BufferedReader first
+            with open(local_path, 'rb', buffering=0) as file:
+                upload = (os.path.basename(local_path), file)
+                size = os.fstat(file.fileno()).st_size
+                if self._should_compress(local_path, size):
+                    response = self._post_compressed(endpoint, upload[0], file.read())
+                    if response.status_code == 415:
+                        self._gzip_supported = False
+                        file.seek(0)
+                        response = self.session.post(endpoint, files={"content": upload})
+                elif size >= STREAM_UPLOAD_THRESHOLD:
+                    # requests would read the whole file and build the multipart body in
+                    # memory; MultipartEncoder reads it from disk as the socket drains
+                    encoder = RewindableMultipartEncoder(
+                        fields={"content": upload + ("application/octet-stream",)}
+                    )
+                    response = self.session.post(
+                        endpoint,
+                        data=encoder,
+                        headers={"Content-Type": encoder.content_type}
+                    )
+                else:
+                    response = self.session.post(
+                        endpoint,
+                        files={"content": upload}
+                    )
+            response.raise_for_status()
+        except FileNotFoundError:
+            log.error("Error: Local file %s does not exist", local_path)
+            return False
+        except requests.RequestException as e:
+            log.error("Error uploading file %s: %s", local_path, self._error_detail(e))
             return False
         
-        with open(local_path, 'rb') as file:
-            content = file.read()
+        self.mark_directory_exists(posixpath.dirname(remote_path))
+        log.info("Successfully uploaded %s to %s", local_path, remote_path)
+        return True
+    
+    def _should_compress(self, local_path, size):
+        """Check whether a file should be sent gzip-encoded"""
+        if not self.compress or not COMPRESS_MIN_SIZE <= size < STREAM_UPLOAD_THRESHOLD:
+            return False
+        if os.path.splitext(local_path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return False
         
-        endpoint = f"{self.api_base_url}/files/path{remote_path}"
-        response = requests.post(
-            endpoint, 
-            headers=self.headers,
-            files={"content": content}
+        with self._gzip_lock:
+            if self._gzip_supported is None:
+                self._gzip_supported = self._probe_gzip()
+        return self._gzip_supported
+    
+    def _post_compressed(self, endpoint, filename, content):
+        """POST a file as a gzip-encoded multipart body"""
+        body, content_type = encode_multipart_formdata({"content": (filename, content)})
+        return self.session.post(
+            endpoint,
+            data=gzip.compress(body, compresslevel=6),
+            headers={"Content-Type": content_type, "Content-Encoding": "gzip"}
         )
+    
+    def _probe_gzip(self):
+        """Check that a gzip-encoded upload is stored decoded, by round-tripping a scratch file"""
+        endpoint = self._files_url % f"/home/{self.username}/.mcp_gzip_probe"
+        payload = b"PythonAnywhere MCP gzip probe\n" * 64
+        try:
+            response = self._post_compressed(endpoint, ".mcp_gzip_probe", payload)
+            supported = response.status_code in (200, 201) and self.session.get(endpoint).content == payload
+            self.session.delete(endpoint)
+        except requests.RequestException:
+            supported = False
         
-        if response.status_code in (200, 201):
-            print(f"Successfully uploaded {local_path} to {remote_path}")
-            return True
-        else:
-            print(f"Error uploading file: {response.status_code} - {response.text}")
-            return False
+        if not supported:
+            log.warning("Compressed uploads are not supported, sending files uncompressed")
+        return supported
     
     def create_directory(self, path):
         """Create a directory on PythonAnywhere"""
-        endpoint = f"{self.api_base_url}/files/path{path}"
-        response = requests.post(
-            endpoint,
-            headers=self.headers,
-            json={"operation": "mkdir"}
-        )
+        endpoint = self._files_url % path
+        try:
+            response = self.session.post(
+                endpoint,
+                json={"operation": "mkdir"}
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            log.error("Error creating directory %s: %s", path, self._error_detail(e))
+            return False
         
-        if response.status_code in (200, 201):
-            print(f"Successfully created directory {path}")
+        self.mark_directory_exists(path)
+        log.info("Successfully created directory %s", path)
+        return True
+    
+    def mark_directory_exists(self, path):
+        """Record that a remote directory, and therefore all its parents, exists"""
+        while path not in self._remote_dirs_known and path not in ("", "/"):
+            self._remote_dirs_known.add(path)
+            path = posixpath.dirname(path)
+    
+    def ensure_directory(self, path):
+        """Create a remote directory unless it is already known to exist"""
+        if path in self._remote_dirs_known:
             return True
-        else:
-            print(f"Error creating directory: {response.status_code} - {response.text}")
-            return False
+        return self.create_directory(path)
     
     def reload_web_app(self):
         """Reload the web app on PythonAnywhere"""
-        endpoint = f"{self.api_base_url}/webapps/{self.username}.pythonanywhere.com/reload/"
-        response = requests.post(endpoint, headers=self.headers)
-        
-        if response.status_code == 200:
-            print("Successfully reloaded web app")
-            return True
-        else:
-            print(f"Error reloading web app: {response.status_code} - {response.text}")
+        endpoint = self._reload_url
+        try:
+            response = self.session.post(endpoint)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            log.error("Error reloading web app: %s", self._error_detail(e))
             return False
+        
+        log.info("Successfully reloaded web app")
+        return True
 
 
 class PythonAnywhereMCP:
     """Model-Controller-Provider for PythonAnywhere"""
     
-    def __init__(self):
-        """Initialize the MCP"""
-        self.client = PythonAnywhereClient()
+    def __init__(self, max_workers=None):
+        """Initialize the MCP, optionally overriding the configured upload concurrency"""
         self.config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_config.json")
         self.config = self._load_config()
+        self._compile_ignores()
+        self.hash_file = os.path.join(os.path.dirname(self.config_file), "mcp_hashes.json")
+        self.wal_file = os.path.join(os.path.dirname(self.config_file), "mcp_uploaded.log")
+        # Every invocation shares the hash cache and upload log, so pushes hold this lock
+        self.lock_file = os.path.join(os.path.dirname(self.config_file), "mcp_state.lock")
+        self._state_lock = FileLock(self.lock_file)
+        if max_workers is None:
+            max_workers = self.config.get("max_concurrent_uploads", 8)
+        # Validated by push_directory, the only place it's used, so a bad stored value
+        # can still be fixed with configure
+        self.max_workers = max_workers
+        self.client = PythonAnywhereClient(
+            pool_size=max(16, max_workers) if isinstance(max_workers, int) else 16,
+            compress=self.config.get("compress_uploads", False)
+        )
+        self._load_state()
+    
+    def __del__(self):
+        """Release the client's HTTP connections"""
+        client = getattr(self, "client", None)
+        if client is not None:
+            client.close()
     
     def _load_config(self):
         """Load configuration from JSON file"""
         if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+            return loads_json(Path(self.config_file).read_bytes())
         else:
             # Default config
             default_config = {
                 "local_root_dir": "",
                 "remote_root_dir": "",
                 "excluded_paths": [".git", "__pycache__", "*.pyc", ".env"],
-                "auto_reload": True
+                "auto_reload": True,
+                "max_concurrent_uploads": 8,
+                "compress_uploads": False
             }
             return default_config
     
+    @staticmethod
+    def _write_json(path, data, indent=False):
+        """Atomically write data to a JSON file, leaving it untouched if it already has that content"""
+        content = dumps_json(data, indent=indent)
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == content:
+                    return
+        except FileNotFoundError:
+            pass
+        
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
     def _save_config(self):
         """Save configuration to JSON file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        self._write_json(self.config_file, self.config, indent=True)
+    
+    def _load_hashes(self):
+        """Load the remote_path -> {sha256, size, mtime_ns} map of previously pushed files.
+        
+        Returns (hashes, reload_pending), where reload_pending is set while files pushed
+        since the last successful web app reload haven't been picked up by one.
+        """
+        if not os.path.exists(self.hash_file):
+            return {}, False
+        
+        state = loads_json(Path(self.hash_file).read_bytes())
+        if isinstance(state.get("files"), dict):
+            hashes, reload_pending = state["files"], state.get("reload_pending", False)
+        else:
+            # Older caches were the bare map, and before that stored the bare digest
+            hashes, reload_pending = state, False
+        return ({path: {"sha256": entry} if isinstance(entry, str) else entry
+                 for path, entry in hashes.items()}, reload_pending)
+    
+    def _save_hashes(self):
+        """Save the pushed file hashes next to the config file"""
+        # Compact, the cache has an entry per pushed file and is never hand-edited
+        self._write_json(self.hash_file, {"files": self._hash_cache, "reload_pending": self._reload_pending})
+        
+        # Everything in the upload log is part of the saved cache now
+        try:
+            os.remove(self.wal_file)
+        except FileNotFoundError:
+            pass
     
-    def configure(self, local_root_dir=None, remote_root_dir=None, excluded_paths=None, auto_reload=None):
+    def _load_state(self):
+        """Load the hash cache, including uploads logged by an interrupted push_directory"""
+        self._hash_cache, self._reload_pending = self._load_hashes()
+        self._replay_wal()
+        
+        # Files in the hash cache were uploaded successfully, so their directories exist
+        for remote_path in self._hash_cache:
+            self.client.mark_directory_exists(posixpath.dirname(remote_path))
+    
+    def _lock_state(self):
+        """Take the state lock and reload the state, which another push may have changed.
+        
+        Returns False if another push is holding the lock; the caller releases it otherwise.
+        """
+        try:
+            self._state_lock.acquire(timeout=0)
+        except Timeout:
+            log.error("Error: Another push is already in progress")
+            return False
+        
+        self._load_state()
+        return True
+    
+    def _replay_wal(self):
+        """Merge uploads logged by an interrupted push_directory into the hash cache.
+        
+        Each line is "<sha256> <size> <mtime_ns> <remote_path>"; a final line without its
+        newline was cut off mid-write and is ignored.
+        """
+        try:
+            data = Path(self.wal_file).read_bytes()
+        except FileNotFoundError:
+            return
+        
+        for line in data.split(b"\n")[:-1]:
+            try:
+                digest, size, mtime_ns, remote_path = line.decode().split(" ", 3)
+                self._hash_cache[remote_path] = {"sha256": digest, "size": int(size), "mtime_ns": int(mtime_ns)}
+            except ValueError:
+                continue
+            # The interrupted push never got to reload the web app
+            self._reload_pending = True
+    
+    @staticmethod
+    def _hash_file(path):
+        """Return the hex SHA-256 digest of a local file"""
+        with open(path, 'rb') as f:
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+            return digest.hexdigest()
+    
+    def _check_changed(self, local_path, remote_path, stat=None):
+        """Compare a local file with the state recorded when it was last pushed.
+        
+        Returns (changed, entry) where entry is the file's current cache entry. A size and
+        mtime matching the cache are trusted without rehashing the file.
+        """
+        cached = self._hash_cache.get(remote_path)
+        if (cached and stat is not None and cached.get("size") == stat.st_size
+                and cached.get("mtime_ns") == stat.st_mtime_ns):
+            return False, cached
+        
+        entry = {"sha256": self._hash_file(local_path)}
+        if stat is not None:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return not cached or cached["sha256"] != entry["sha256"], entry
+    
+    def _upload_if_changed(self, local_path, remote_path, stat=None, force=False):
+        """Upload a file unless it matches the last pushed version.
+        
+        Returns (result, entry) where result is None if the upload was skipped.
+        """
+        changed, entry = self._check_changed(local_path, remote_path, stat)
+        if not changed and not force:
+            return None, entry
+        return self.client.upload_file(local_path, remote_path), entry
+    
+    def _reload_if_pending(self):
+        """Reload the web app if auto_reload is enabled and pushed files are waiting for a reload.
+        
+        Returns False if the reload failed; it then stays pending, so the next push retries it
+        even if that push has nothing to upload.
+        """
+        if not self._reload_pending or not self.config["auto_reload"]:
+            return True
+        if not self.client.reload_web_app():
+            return False
+        
+        self._reload_pending = False
+        self._save_hashes()
+        return True
+    
+    def configure(self, local_root_dir=None, remote_root_dir=None, excluded_paths=None, auto_reload=None,
+                  max_concurrent_uploads=None):
         """Configure the MCP"""
         if local_root_dir:
             self.config["local_root_dir"] = os.path.abspath(local_root_dir)
@@ -133,105 +501,261 @@ class PythonAnywhereMCP:
         
         if excluded_paths is not None:
             self.config["excluded_paths"] = excluded_paths
+            self._compile_ignores()
         
         if auto_reload is not None:
             self.config["auto_reload"] = auto_reload
         
+        if max_concurrent_uploads is not None:
+            self.config["max_concurrent_uploads"] = max_concurrent_uploads
+        
         self._save_config()
-        print("Configuration saved successfully")
+        log.info("Configuration saved successfully")
+    
+    def _compile_ignores(self):
+        """Compile excluded_paths into a single regex matched against "/"-separated relative paths.
+        
+        A plain pattern (".env") matches anywhere in the path, so it also excludes ".env.local"
+        and ".github". A trailing "*" ("test_*") matches names starting with the prefix, and other
+        "*" or "?" wildcards ("*.pyc") glob against a whole name.
+        """
+        parts = []
+        for pattern in self.config["excluded_paths"]:
+            if not pattern:
+                continue
+            if "*" not in pattern and "?" not in pattern:
+                parts.append(re.escape(pattern))
+            elif pattern.endswith("*") and "*" not in pattern[:-1] and "?" not in pattern:
+                parts.append(r"(?:^|/)%s[^/]*\Z" % re.escape(pattern[:-1]))
+            else:
+                glob = re.escape(pattern).replace(r"\*", "[^/]*").replace(r"\?", "[^/]")
+                parts.append(r"(?:^|/)%s\Z" % glob)
+        
+        if parts:
+            self._ignore_re = re.compile("|".join(parts))
+        else:
+            self._ignore_re = None
     
     def _should_ignore(self, path):
         """Check if a path should be ignored based on excluded_paths"""
-        for pattern in self.config["excluded_paths"]:
-            if pattern.endswith("*"):
-                prefix = pattern[:-1]
-                if os.path.basename(path).startswith(prefix):
-                    return True
-            elif pattern in path:
-                return True
-        return False
-    
-    def push_directory(self, local_dir=None, remote_dir=None, create_dirs=True):
-        """Push a directory and its contents to PythonAnywhere"""
+        if self._ignore_re is None:
+            return False
+        if os.sep != "/":
+            path = path.replace(os.sep, "/")
+        return self._ignore_re.search(path) is not None
+    
+    def _walk(self, root):
+        """Yield (full_path, rel_path, is_dir, stat) for every entry under root that isn't ignored.
+        
+        rel_path is "/"-separated and directories are yielded before their contents. Ignored
+        directories are not descended into, and neither are symlinked ones, as with os.walk.
+        stat is the (symlink-followed) os.stat_result for files and None for directories.
+        """
+        stack = [(root, "")]
+        while stack:
+            path, rel_prefix = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError as e:
+                log.error("Error reading directory %s: %s", path, e)
+                continue
+            
+            for entry in entries:
+                rel_path = rel_prefix + entry.name
+                if self._should_ignore(rel_path):
+                    continue
+                
+                try:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            yield entry.path, rel_path, True, None
+                            stack.append((entry.path, rel_path + "/"))
+                    elif entry.is_file():
+                        yield entry.path, rel_path, False, entry.stat()
+                except OSError as e:
+                    log.error("Error reading %s: %s", entry.path, e)
+    
+    def push_directory(self, local_dir=None, remote_dir=None, create_dirs=True, force=False):
+        """Push a directory and its contents to PythonAnywhere, skipping unchanged files"""
         local_dir = local_dir or self.config["local_root_dir"]
         remote_dir = remote_dir or self.config["remote_root_dir"]
         
         if not local_dir or not remote_dir:
-            print("Error: Local and remote directories must be specified")
+            log.error("Error: Local and remote directories must be specified")
+            return False
+        
+        if not isinstance(self.max_workers, int) or self.max_workers < 1:
+            log.error("Error: max_concurrent_uploads must be a positive integer, got %r", self.max_workers)
             return False
         
-        print(f"Pushing directory {local_dir} to {remote_dir}")
+        if not self._lock_state():
+            return False
+        try:
+            log.info("Pushing directory %s to %s", local_dir, remote_dir)
+            # Remote paths always use "/", _walk already yields "/"-separated relative paths
+            return self._push_directory(local_dir, remote_dir.rstrip("/") + "/", create_dirs, force)
+        finally:
+            self._state_lock.release()
+    
+    def _push_directory(self, local_dir, remote_prefix, create_dirs, force):
+        """Body of push_directory, run with the state lock held"""
+        uploaded = skipped = 0
+        futures = []
+        failed = []
+        results_lock = threading.Lock()
         
-        for root, dirs, files in os.walk(local_dir):
-            # Create relative path from local_dir
-            rel_path = os.path.relpath(root, local_dir)
-            if rel_path == ".":
-                rel_path = ""
-            
-            # Skip ignored directories
-            if self._should_ignore(rel_path):
-                continue
-            
-            # Create remote directory if it doesn't exist and create_dirs is True
-            if create_dirs and rel_path:
-                remote_path = os.path.join(remote_dir, rel_path).replace("\\", "/")
-                self.client.create_directory(remote_path)
+        def record(local_file_path, remote_file_path, future):
+            """Record an upload's outcome in the worker thread as soon as it finishes"""
+            nonlocal uploaded, skipped
+            if future.cancelled():
+                return
+            try:
+                result, entry = future.result()
+            except Exception as e:
+                log.error("Error uploading file %s: %s", local_file_path, e)
+                with results_lock:
+                    failed.append((local_file_path, remote_file_path))
+                return
             
-            # Upload files
-            for file in files:
-                if self._should_ignore(file):
-                    continue
-                
-                local_file_path = os.path.join(root, file)
-                
-                # Calculate remote file path
-                if rel_path:
-                    remote_file_path = os.path.join(remote_dir, rel_path, file).replace("\\", "/")
+            with results_lock:
+                if result is None:
+                    log.debug("Skipping unchanged file %s", local_file_path)
+                    skipped += 1
+                elif result:
+                    uploaded += 1
+                    wal.write(f"{entry['sha256']} {entry['size']} {entry['mtime_ns']} {remote_file_path}\n".encode())
+                    if uploaded % WAL_FSYNC_INTERVAL == 0:
+                        os.fsync(wal.fileno())
                 else:
-                    remote_file_path = os.path.join(remote_dir, file).replace("\\", "/")
+                    failed.append((local_file_path, remote_file_path))
+                    return
                 
-                # Upload the file
-                self.client.upload_file(local_file_path, remote_file_path)
+                # Also refresh entries of skipped files whose mtime changed but contents didn't
+                self._hash_cache[remote_file_path] = entry
         
-        # Reload web app if auto_reload is enabled
-        if self.config["auto_reload"]:
-            self.client.reload_web_app()
+        # Each upload is logged the moment it completes, so an interrupted push can resume
+        # without resending it; the log is folded into the hash cache once the push finishes
+        wal = open(self.wal_file, 'ab', buffering=0)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                try:
+                    for local_path, rel_path, is_dir, stat in self._walk(local_dir):
+                        remote_path = remote_prefix + rel_path
+                        
+                        # Create remote directories before dispatching their uploads; _walk
+                        # yields every directory before anything inside it
+                        if is_dir:
+                            if create_dirs and force:
+                                self.client.create_directory(remote_path)
+                            elif create_dirs:
+                                self.client.ensure_directory(remote_path)
+                            continue
+                        
+                        future = executor.submit(self._upload_if_changed, local_path, remote_path, stat, force)
+                        future.add_done_callback(functools.partial(record, local_path, remote_path))
+                        futures.append(future)
+                    
+                    # Wait here rather than in the executor's exit, so an interrupt while the
+                    # last uploads run still cancels the rest
+                    wait(futures)
+                except BaseException:
+                    # Drop queued uploads so Ctrl-C stops the push promptly; only the
+                    # uploads already running are waited for, and still get logged
+                    executor.shutdown(cancel_futures=True)
+                    raise
+        finally:
+            wal.close()
         
-        return True
+        # Always saved, even if nothing changed here, so uploads replayed from an
+        # interrupted push end up in the cache and the log is removed
+        if uploaded:
+            self._reload_pending = True
+        self._save_hashes()
+        
+        if skipped:
+            log.info("Skipped %d unchanged file(s)", skipped)
+        if failed:
+            # Failed files aren't recorded in the hash cache, so re-running push-dir
+            # uploads only these
+            log.error("%d of %d file(s) failed to upload:", len(failed), len(futures))
+            for local_file_path, remote_file_path in sorted(failed):
+                log.error("  %s -> %s", local_file_path, remote_file_path)
+        
+        # Reload web app if auto_reload is enabled and something changed, here or in
+        # an earlier push whose reload failed
+        reloaded = self._reload_if_pending()
+        
+        return not failed and reloaded
     
-    def push_file(self, local_file, remote_file=None):
-        """Push a single file to PythonAnywhere"""
-        if not os.path.exists(local_file):
-            print(f"Error: Local file {local_file} does not exist")
+    def push_file(self, local_file, remote_file=None, force=False):
+        """Push a single file to PythonAnywhere unless it is unchanged"""
+        try:
+            stat = os.stat(local_file)
+        except FileNotFoundError:
+            log.error("Error: Local file %s does not exist", local_file)
             return False
         
         if not remote_file:
             # Use the same path relative to local_root_dir
             if not self.config["local_root_dir"] or not self.config["remote_root_dir"]:
-                print("Error: local_root_dir and remote_root_dir must be configured")
+                log.error("Error: local_root_dir and remote_root_dir must be configured")
                 return False
             
             rel_path = os.path.relpath(local_file, self.config["local_root_dir"])
-            remote_file = os.path.join(self.config["remote_root_dir"], rel_path).replace("\\", "/")
+            remote_file = posixpath.join(self.config["remote_root_dir"], rel_path.replace(os.sep, "/"))
+        
+        if not self._lock_state():
+            return False
+        try:
+            return self._push_file(local_file, remote_file, stat, force)
+        finally:
+            self._state_lock.release()
+    
+    def _push_file(self, local_file, remote_file, stat, force):
+        """Body of push_file, run with the state lock held"""
+        changed, entry = self._check_changed(local_file, remote_file, stat)
+        if not changed and not force:
+            log.info("%s is unchanged since the last push, skipping", local_file)
+            return self._reload_if_pending()
         
         # Make sure the remote directory exists
-        remote_dir = os.path.dirname(remote_file)
-        if remote_dir:
+        remote_dir = posixpath.dirname(remote_file)
+        if remote_dir and force:
             self.client.create_directory(remote_dir)
+        elif remote_dir:
+            self.client.ensure_directory(remote_dir)
         
         # Upload the file
         result = self.client.upload_file(local_file, remote_file)
+        if not result:
+            return False
         
-        # Reload web app if auto_reload is enabled and file was uploaded successfully
-        if result and self.config["auto_reload"]:
-            self.client.reload_web_app()
+        self._hash_cache[remote_file] = entry
+        self._reload_pending = True
+        self._save_hashes()
         
-        return result
+        # Reload web app if auto_reload is enabled and file was uploaded successfully
+        return self._reload_if_pending()
+
+
+def positive_int(value):
+    """argparse type accepting only integers greater than zero"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 def main():
     """Main function to run the MCP from command line"""
     parser = argparse.ArgumentParser(description="PythonAnywhere MCP - Push changes to PythonAnywhere")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Only report warnings and errors")
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="Also report skipped files and other details")
     
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
@@ -241,23 +765,36 @@ def main():
     config_parser.add_argument("--remote-dir", help="Remote root directory on PythonAnywhere")
     config_parser.add_argument("--excluded", nargs="*", help="Patterns to exclude")
     config_parser.add_argument("--auto-reload", type=bool, help="Automatically reload web app after pushing changes")
+    config_parser.add_argument("--max-concurrent-uploads", type=positive_int, help="Number of files uploaded in parallel by push-dir")
     
     # Push directory command
     push_dir_parser = subparsers.add_parser("push-dir", help="Push a directory to PythonAnywhere")
     push_dir_parser.add_argument("--local-dir", help="Local directory to push (default: configured local_root_dir)")
     push_dir_parser.add_argument("--remote-dir", help="Remote directory on PythonAnywhere (default: configured remote_root_dir)")
     push_dir_parser.add_argument("--no-create-dirs", action="store_false", dest="create_dirs", help="Don't create directories on PythonAnywhere")
+    push_dir_parser.add_argument("--jobs", type=positive_int, help="Number of files to upload in parallel (default: configured max_concurrent_uploads)")
+    push_dir_parser.add_argument("--force", action="store_true", help="Upload all files, even those unchanged since the last push")
     
     # Push file command
     push_file_parser = subparsers.add_parser("push-file", help="Push a file to PythonAnywhere")
     push_file_parser.add_argument("local_file", help="Local file to push")
     push_file_parser.add_argument("--remote-file", help="Remote file path on PythonAnywhere (default: same relative path as local file)")
+    push_file_parser.add_argument("--force", action="store_true", help="Upload the file even if it is unchanged since the last push")
     
     # Parse arguments
     args = parser.parse_args()
     
+    if args.quiet:
+        level = logging.WARNING
+    elif args.verbose:
+        level = logging.DEBUG
+    else:
+        level = logging.INFO
+    # stdout, where the progress messages have always gone
+    logging.basicConfig(level=level, format="%(message)s", stream=sys.stdout)
+    
     # Create MCP instance
-    mcp = PythonAnywhereMCP()
+    mcp = PythonAnywhereMCP(max_workers=getattr(args, "jobs", None))
     
     # Execute command
     if args.command == "configure":
@@ -265,18 +802,21 @@ def main():
             local_root_dir=args.local_dir,
             remote_root_dir=args.remote_dir,
             excluded_paths=args.excluded,
-            auto_reload=args.auto_reload
+            auto_reload=args.auto_reload,
+            max_concurrent_uploads=args.max_concurrent_uploads
         )
     elif args.command == "push-dir":
         mcp.push_directory(
             local_dir=args.local_dir,
             remote_dir=args.remote_dir,
-            create_dirs=args.create_dirs
+            create_dirs=args.create_dirs,
+            force=args.force
         )
     elif args.command == "push-file":
         mcp.push_file(
             local_file=args.local_file,
-            remote_file=args.remote_file
+            remote_file=args.remote_file,
+            force=args.force
         )
     else:
         parser.print_help()